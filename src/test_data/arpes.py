@@ -1,13 +1,18 @@
+import functools
 import math
 import numpy as np
-from scipy.interpolate import CubicHermiteSpline, RegularGridInterpolator
-from scipy.ndimage import zoom
+from scipy.interpolate import CubicHermiteSpline
+from scipy.ndimage import map_coordinates, zoom
 import scipy.constants as sci_const
 import time
 import xarray as xr
 
 # Generic helper functions
 
+# constants used by reduce_to_firstBZ, computed once rather than per call.
+_SQRT3 = math.sqrt(3)
+_COS60, _SIN60 = 1 / 2, _SQRT3 / 2
+
 def generate1Dpoly(zeros):
     """Generates a 1D polynomial with zero gradient at each point in zeros.
 
@@ -32,6 +37,109 @@ def generate1Dpoly(zeros):
     return poly
 
 
+def _hermite2(x, x0, x1, y0, y1):
+    """Evaluates the zero end gradient cubic between two points.
+
+    Closed form equivalent of `generate1Dpoly([(x0, y0), (x1, y1)])(x)`,
+    avoiding the construction of a `CubicHermiteSpline` object.
+
+    Parameters
+    ----------
+    x : float or numpy.ndarray.
+        The x value (or values) at which to evaluate the cubic.
+    x0, x1 : float or numpy.ndarray.
+        The x coordinates of the two points where the gradient is zero.
+    y0, y1 : float or numpy.ndarray.
+        The y coordinates of the two points where the gradient is zero.
+
+    Returns
+    -------
+    y : float or numpy.ndarray.
+        The value (or values) of the cubic at x.
+    """
+    t = (x - x0) / (x1 - x0)
+
+    return y0 + (y1 - y0) * (3 * t * t - 2 * t * t * t)
+
+
+def _build_hermite_zero_deriv(xs, ys):
+    """Coefficients of the zero gradient cubic spline through a set of points.
+
+    Closed form equivalent of the coefficients of `generate1Dpoly`, on each
+    interval [xs[i], xs[i+1]] the spline is the cubic
+    $c_{0} + c_{1}t + c_{2}t^{2} + c_{3}t^{3}$ in the local co-ordinate
+    $t = (x - xs[i])/(xs[i+1] - xs[i])$. No linear system needs solving as
+    the gradient at every point is zero.
+
+    Parameters
+    ----------
+    xs : numpy.ndarray.
+        The (n,) strictly increasing x coordinates of the points.
+    ys : numpy.ndarray.
+        The (n, ...) y coordinates of the points, any trailing dimensions
+        hold independent splines sharing the same xs.
+
+    Returns
+    -------
+    coefs : numpy.ndarray.
+        The (4, n-1, ...) coefficients ($c_{0}$ to $c_{3}$) of each interval.
+    """
+    if np.any(np.diff(xs) <= 0):
+        raise ValueError(f'In a call to _build_hermite_zero_deriv the x '
+                         f'coordinates ({xs}) were not strictly increasing')
+
+    ys = np.asarray(ys, dtype=float)
+    dy = ys[1:] - ys[:-1]
+    coefs = np.zeros((4, *dy.shape))
+    coefs[0] = ys[:-1]
+    coefs[2] = 3 * dy
+    coefs[3] = -2 * dy
+
+    return coefs
+
+
+def _eval_hermite(coefs, xs, x):
+    """Evaluates a spline built by `_build_hermite_zero_deriv`.
+
+    Points outside xs are extrapolated using the first or last interval, as
+    `generate1Dpoly` does.
+
+    Parameters
+    ----------
+    coefs : numpy.ndarray.
+        The (4, n-1, ...) coefficients returned by `_build_hermite_zero_deriv`.
+    xs : numpy.ndarray.
+        The (n,) x coordinates used to build coefs.
+    x : float or numpy.ndarray.
+        The x value (or values), broadcastable against the trailing
+        dimensions of coefs, at which to evaluate the spline.
+
+    Returns
+    -------
+    y : numpy.ndarray.
+        The value (or values) of the spline at x.
+    """
+    xs = np.asarray(xs, dtype=float)
+    if len(xs) == 2:  # a single interval, no search required
+        t = (x - xs[0]) / (xs[1] - xs[0])
+        c0, c1, c2, c3 = coefs[:, 0]
+    else:
+        interval = np.clip(np.searchsorted(xs, x, side='right') - 1, 0,
+                           len(xs) - 2)
+        t = (x - xs[interval]) / (xs[interval + 1] - xs[interval])
+        # pick each point's interval, broadcasting the trailing dimensions
+        shape = np.broadcast_shapes(interval.shape, coefs.shape[2:])
+        index = np.broadcast_to(interval, shape)[np.newaxis, np.newaxis]
+        coefs = coefs.reshape(*coefs.shape[:2],
+                              *(1,) * (len(shape) + 2 - coefs.ndim),
+                              *coefs.shape[2:])
+        c0, c1, c2, c3 = np.take_along_axis(
+            np.broadcast_to(coefs, (*coefs.shape[:2], *shape)), index,
+            axis=1)[:, 0]
+
+    return ((c3 * t + c2) * t + c1) * t + c0
+
+
 def reduce_to_firstBZ(coords, lattice_constants=(2.5, 3.4)):
     """ Reduces coordinates to the minimal unique hexagonal BZ region.
 
@@ -51,7 +159,9 @@ def reduce_to_firstBZ(coords, lattice_constants=(2.5, 3.4)):
         hexagonal BZ region. Optionally the $k_{z}$ coordinate (which is
         reduced) and the binding energy (which is passed through unchanged)
         can be added in the order kx, ky, kz, Eb. If inputting numpy.array's
-        then all arrays must be of equal length.
+        then all arrays must be broadcastable against each other, a single
+        (D, N) numpy.ndarray (D = 2, 3 or 4) is also accepted and is reduced
+        in one pass.
     lattice_constants : float or (float, float), optional.
             The in-plane lattice constant or both lattice constants (in-plane,
             out-of-plane) for the hexagonal brillouin zone in Angstroms,
@@ -62,10 +172,14 @@ def reduce_to_firstBZ(coords, lattice_constants=(2.5, 3.4)):
     reduced : [float or numpy.array, float or numpy.array
                (,float or numpy.array, float or numpy.array)],
         The reduced $k_{x}$, $k_{y}$ coordinates within the minimal unique
-        hexagonal BZ region.
+        hexagonal BZ region. The $k_{x}$, $k_{y}$ arrays have their
+        broadcast shape while the optional $k_{z}$ and $E_{b}$ arrays keep
+        their input shape.
 
     """
 
+    coords = [np.asarray(coord, dtype=float) for coord in coords]
+
     if isinstance(lattice_constants, (float, int)):
         if len(coords) > 2:
             raise ValueError("If the z-coordinate is given the perpendicular"
@@ -76,38 +190,55 @@ def reduce_to_firstBZ(coords, lattice_constants=(2.5, 3.4)):
     BZ_size = (2 * math.pi / lattice_constants[0]) * (1 / 2)
 
     # primitive translation vectors for hexagonal BZ
-    translation_vectors = [[2 * BZ_size, 0], [BZ_size, BZ_size * np.sqrt(3)]]
-    # rotation matrix for -60 deg
-    rotation_matrix = np.array([[1 / 2, np.sqrt(3) / 2],
-                                [-1 * np.sqrt(3) / 2, 1 / 2]])
+    translation_vectors = [[2 * BZ_size, 0], [BZ_size, BZ_size * _SQRT3]]
 
     # move to the +ve x, +ve y quadrant of the BZ.
-    reduced = [abs(point) for point in coords]
+    reduced = np.abs(np.broadcast_arrays(coords[0], coords[1]))
 
-    # move the origin to the bottom left corner of the BZ
-    reduced = [abs(reduced[0]) + BZ_size,
-               abs(reduced[1]) + BZ_size / np.sqrt(3)]
+    # points already in the minimal unique hexagonal region are left as is.
+    # When they are the majority only the remaining points are gathered,
+    # translated, rotated and mirrored, otherwise all points are reduced
+    # (cheaper than the gather) and the in region values restored after.
+    outside = (reduced[0] > BZ_size) | (reduced[0] < _SQRT3 * reduced[1])
+    gather = 2 * np.count_nonzero(outside) < outside.size
+    points = reduced[:, outside] if gather else reduced.copy()
 
-    # translate to the first BZ
-    translation_times = np.ceil(abs(reduced[1]) / translation_vectors[1][1]) - 1
-    reduced[1] = reduced[1] % translation_vectors[1][1]
-    reduced[0] = reduced[0] - translation_times * translation_vectors[1][0]
-    reduced[0] = reduced[0] % translation_vectors[0][0]
+    # move the origin to the bottom left corner of the BZ
+    points[0] = points[0] + BZ_size
+    points[1] = points[1] + BZ_size / _SQRT3
+
+    # translate to the first BZ, by whole multiples of the oblique vector
+    # first then of the axis-parallel one (floor and reciprocal multiplies
+    # rather than ceil, divisions and modulos).
+    translation_times = np.floor(points[1] * (1 / translation_vectors[1][1]))
+    points[1] -= translation_times * translation_vectors[1][1]
+    points[0] -= translation_times * translation_vectors[1][0]
+    points[0] -= (np.floor(points[0] * (1 / translation_vectors[0][0]))
+                  * translation_vectors[0][0])
 
     # move origin to the BZ centre again.
-    reduced[0] = reduced[0] - BZ_size
-    reduced[1] = reduced[1] - BZ_size / np.sqrt(3)
+    points[0] = points[0] - BZ_size
+    points[1] = points[1] - BZ_size / _SQRT3
 
     # move to the +ve x, +ve y quadrant of the BZ.
-    reduced = [abs(point) for point in reduced]
+    points = np.abs(points)
 
     # if outside the minimal unique hexagonal region rotate into it.
-    if reduced[0] < np.sqrt(3) * reduced[1]:  # y=mx+c->x=y/m: c=0, m=1/sqrt(3)
-        reduced = abs(np.dot(rotation_matrix, reduced))
-        reduced = reduced.tolist()
+    mask = points[0] < _SQRT3 * points[1]  # y=mx+c->x=y/m: c=0, m=1/sqrt(3)
+    # rotation by -60 deg, written out rather than as a matrix product
+    rotated_x = np.abs(_COS60 * points[0] + _SIN60 * points[1])
+    rotated_y = np.abs(_COS60 * points[1] - _SIN60 * points[0])
+    points[0] = np.where(mask, rotated_x, points[0])
+    points[1] = np.where(mask, rotated_y, points[1])
     # mirror coord around the vertical BZ boundary if necessary
-    if reduced[0] > BZ_size:
-        reduced[0] = 2 * BZ_size - reduced[0]
+    points[0] = np.where(points[0] > BZ_size, 2 * BZ_size - points[0],
+                         points[0])
+
+    if gather:
+        reduced[:, outside] = points
+    else:
+        reduced = np.where(outside, points, reduced)
+    reduced = [reduced[0], reduced[1]]
 
     if len(coords) > 2:  # if the z coord was given
         reciprocal_constant = (2 * math.pi / lattice_constants[1]) * (1 / 2)
@@ -148,7 +279,10 @@ def generate_symmetry_lines(symmetry_point_energies, lattice_constant=2.5):
         A list of two dictionaries (one for each non x-axis parallel high
         symmetry direction) that holds functions mapping $k_{x}$ (under the
         'kx' key) and Binding Energy (under the 'Eb' key) to $k_{y}$
-        respectively.
+        respectively. The numeric values used by these functions are also
+        held under the 'coefficients' ($k_{x}$ (slope, intercept)),
+        'origin' (distance function origin) and 'points' ((distance,
+        Binding Energy) end points) keys.
 
     """
 
@@ -157,13 +291,44 @@ def generate_symmetry_lines(symmetry_point_energies, lattice_constant=2.5):
                        [BZ_size, BZ_size / np.sqrt(3)],
                        [BZ_size, 0.]]
 
+    def line_function(slope, intercept):
+        """Generates the function that maps y to x along a symmetry line
+
+        Parameters
+        ----------
+        slope, intercept : float
+            The slope and intercept of the straight line mapping y to x.
+
+        Returns
+        -------
+        return_function : func.
+            The function that returns x as a function of ky.
+        """
+
+        def return_function(ky):
+            """The returned function that maps ky to x.
+            Parameters
+            ----------
+            ky : float or numpy.ndarray
+                The y value(s) for which x needs to be computed.
+
+            Returns
+            -------
+            output : float or numpy.ndarray
+                The x value(s) for the given ky value(s).
+            """
+
+            return slope * ky + intercept
+
+        return return_function
+
     def distance_function(x_coefficients, kx1, ky1):
         """Generates a function that maps y to distance along symmetry line
 
         Parameters
         ----------
-        x_coefficients : numpy.ndarray
-            numpy array containing the polynomial coefficients to map y to x.
+        x_coefficients : (float, float)
+            The (slope, intercept) of the straight line mapping y to x.
         kx1, ky1 : float
             initial x and y components
 
@@ -178,30 +343,33 @@ def generate_symmetry_lines(symmetry_point_energies, lattice_constant=2.5):
             """The returned function that maps ky to distance.
             Parameters
             ----------
-            ky : float
-                The y value for which the distance along the symmetry line needs
-                to be computed.
+            ky : float or numpy.ndarray
+                The y value(s) for which the distance along the symmetry line
+                needs to be computed.
 
             Returns
             -------
-            output : float
-                The distance along the symmetry line for the given ky value.
+            output : float or numpy.ndarray
+                The distance along the symmetry line for the given ky
+                value(s).
             """
 
-            output = np.sqrt((np.poly1d(x_coefficients)(ky) - kx1) ** 2 +
+            slope, intercept = x_coefficients
+            output = np.sqrt((slope * ky + intercept - kx1) ** 2 +
                              (ky - ky1) ** 2)
             return output
 
         return return_function
 
-    def energy_function(polynomial_function, distance_func):
+    def energy_function(point_i, point_f, distance_func):
         """Binding energy as a function of ky along a high symmetry direction.
 
         Parameters
         ----------
-        polynomial_function : scipy.interpolate._cubic.CubicHermiteSpline
-            The 1D polynomial that varies the Energy along the high symmetry
-            direction.
+        point_i, point_f : (float, float)
+            The (distance, Energy) coordinates of the start and end points of
+            the high symmetry direction, the energy varies between them as a
+            cubic with zero gradient at each point.
         distance_func : func .
             A function generated by `distance_function` that returns distance
             along the high symmetry direction for the given ky value.
@@ -217,16 +385,17 @@ def generate_symmetry_lines(symmetry_point_energies, lattice_constant=2.5):
 
             Parameters
             ----------
-            ky : float
-                The ky value for which the distance along the symmetry line
-                needs to be computed.
+            ky : float or numpy.ndarray
+                The ky value(s) for which the Binding Energy needs to be
+                computed, arrays are evaluated in a single call.
 
             Returns
             -------
-            output : float
-                The Binding Energy for the given ky value.
+            output : float or numpy.ndarray
+                The Binding Energy for the given ky value(s).
             """
-            output = polynomial_function(distance_func(ky))
+            output = _hermite2(distance_func(ky), point_i[0], point_f[0],
+                               point_i[1], point_f[1])
 
             return output
 
@@ -235,25 +404,128 @@ def generate_symmetry_lines(symmetry_point_energies, lattice_constant=2.5):
     # Generate the polynomials along the high symmetry lines.
     symmetry_lines = []
     for i in range(1, 3):
-        coef = np.polyfit(*zip((symmetry_points[i - 1][1],
-                                symmetry_points[i - 1][0]),
-                               (symmetry_points[i][1],
-                                symmetry_points[i][0])),
-                          1)
+        # straight line through the two points (no least squares fit needed)
+        (x0, y0), (x1, y1) = symmetry_points[i - 1], symmetry_points[i]
+        slope = (x1 - x0) / (y1 - y0)
+        coef = (slope, x0 - slope * y0)
         # x as a function of y
-        symmetry_lines.append({'x': np.poly1d(coef)})
+        symmetry_lines.append({'x': line_function(*coef)})
         # distance along symmetry line as a function of y
-        distance = distance_function(coef, symmetry_points[i - 1][1],
-                                     symmetry_points[i - 1][0])
+        origin = (symmetry_points[i - 1][1], symmetry_points[i - 1][0])
+        distance = distance_function(coef, *origin)
         point_i = (0, symmetry_point_energies[i - 1],)
         point_f = (distance(symmetry_points[i][1]), symmetry_point_energies[i])
         # E value as a function of distance along symmetry line
-        polynomial = generate1Dpoly([point_i, point_f])
-        symmetry_lines[i - 1]['Eb'] = energy_function(polynomial, distance)
+        symmetry_lines[i - 1]['Eb'] = energy_function(point_i, point_f,
+                                                      distance)
+        # the numeric values behind the functions, used by _energy_kernel
+        symmetry_lines[i - 1]['coefficients'] = coef
+        symmetry_lines[i - 1]['origin'] = origin
+        symmetry_lines[i - 1]['points'] = (point_i, point_f)
 
     return symmetry_lines
 
 
+@functools.lru_cache(maxsize=64)
+def _symmetry_lines_cached(symmetry_point_energies, lattice_constant):
+    """Memoized `generate_symmetry_lines` for repeated Band parameters.
+
+    The returned symmetry lines are shared between callers with the same
+    arguments and should not be modified.
+
+    Parameters
+    ----------
+    symmetry_point_energies : (float, float, float), in the unit of eV.
+        A (hashable) tuple of the binding energies passed to
+        `generate_symmetry_lines`.
+    lattice_constant : float.
+        The lattice constant (in-plane) for the hexagonal brillouin zone in
+        Angstroms.
+
+    Returns
+    -------
+    symmetry_lines : [{'kx':kx(ky) function, 'E':E(ky) function}, {...}].
+        The symmetry lines returned by `generate_symmetry_lines`.
+    """
+
+    return generate_symmetry_lines(symmetry_point_energies,
+                                   lattice_constant=lattice_constant)
+
+
+def _energy_kernel(kx, ky, kz, coefficients, origins, points,
+                   lattice_constants=(2.5, 3.4)):
+    """Binding energies of a band from numeric symmetry line values only.
+
+    The numeric core of `Band._energy_vec`, it takes only floats and arrays
+    of floats (no scipy objects or closures) describing the symmetry lines
+    generated by `generate_symmetry_lines` for each $k_{z}$ high symmetry
+    plane.
+
+    Parameters
+    ----------
+    kx, ky, kz : numpy.ndarray, numpy.ndarray, numpy.ndarray.
+        Equal length arrays of the kx, ky, and kz values for which the
+        energy is required.
+    coefficients : numpy.ndarray.
+        A (2, 2, 2) array holding the (slope, intercept) of $k_{x}$ as a
+        function of $k_{y}$ for each symmetry line in each $k_{z}$ plane.
+    origins : numpy.ndarray.
+        A (2, 2, 2) array holding the origin of the distance function for
+        each symmetry line in each $k_{z}$ plane.
+    points : numpy.ndarray.
+        A (2, 2, 2, 2) array holding the start and end (distance, Binding
+        Energy) points for each symmetry line in each $k_{z}$ plane.
+    lattice_constants : (float, float), optional.
+        The lattice constants (in-plane, out-of-plane) for the hexagonal
+        brillouin zone in Angstroms, default is approximately equal to that
+        for graphene (2.5, 3.4).
+
+    Returns
+    -------
+    Eb : numpy.ndarray, in the unit of eV.
+        The binding energies for the given kx, ky, kz values.
+    """
+
+    reciprocal_constant = 2 * math.pi / lattice_constants[1]
+
+    # shift the z 'origin' to the BZ boundary and into +ve half
+    kz = (np.abs(kz) + reciprocal_constant / 2)
+    # translate to the first BZ
+    kz = kz % reciprocal_constant
+    # shift the z 'origin' back to the BZ centre
+    kz = np.abs(kz - reciprocal_constant / 2)
+    # reduce the in-plane constants to the first BZ.
+    reduced = reduce_to_firstBZ([kx, ky],
+                                lattice_constants=lattice_constants[0])
+
+    plane_Eb = []
+    # for the 2 kz high symmetry points generate an energy
+    for plane in range(2):
+        # Evaluate the end points parallel to the kx axis for each ky
+        x = []
+        Eb = []
+        for line in range(2):
+            slope, intercept = coefficients[plane, line]
+            kx1, ky1 = origins[plane, line]
+            (d_i, Eb_i), (d_f, Eb_f) = points[plane, line]
+            x.append(slope * reduced[1] + intercept)
+            distance = np.sqrt((x[line] - kx1) ** 2 + (reduced[1] - ky1) ** 2)
+            Eb.append(_hermite2(distance, d_i, d_f, Eb_i, Eb_f))
+        edge_case = x[0] >= x[1]  # solves an edge case
+        # shift x_f for the edge case points to avoid a zero division
+        x[1] = np.where(edge_case, x[0] + 1, x[1])
+        plane_Eb.append(np.where(edge_case, Eb[0],
+                                 _hermite2(reduced[0], x[0], x[1], Eb[0],
+                                           Eb[1])))
+
+    # interpolate between the kz high symmetry planes
+    kz_symm_points = np.array([0, reciprocal_constant / 2])
+    coefs = _build_hermite_zero_deriv(kz_symm_points, np.stack(plane_Eb))
+    Eb = _eval_hermite(coefs, kz_symm_points, kz)
+
+    return Eb
+
+
 def gaussian(x, centre, width):
     """1D Gaussian function that returns intensity at the x value(s).
 
@@ -345,24 +617,35 @@ def fermi(binding_energy, temperature=300, fermi_energy=0, zero_offset=0):
     return amplitude
 
 
+# photoemission constants used by perpendicular_momentum
+_EV_TO_J = 1.6E-19  # convert from eV to J
+# A_hbar^2 = 2m_e/hbar^2 folded with the eV -> J and m^(-2) -> Ang^(-2)
+# conversions so energies in eV give momenta directly in Ang^(-1).
+_A_HBAR2 = 2 * sci_const.m_e * _EV_TO_J / sci_const.hbar ** 2 * 1E-20
+
+
 def perpendicular_momentum(photon_energy, parallel_momentum,
                            binding_energy=0.0, inner_potential=15.0,
                            work_function=5.0):
-    """Converts photon energies to perpendicular momentum.
+    r"""Converts photon energies to perpendicular momentum.
 
     This function converts photon energy (energies) to perpendicular
     momentum(s) using the relationships:
 
         $A_{\hbar}=\sqrt{2m_{e}}/\hbar$
         $E_{k}= (E_{ph}-E_{b}-\Phi)$
-        $\theta=asin(A_{\hbar}*|k_{\parallel}|/E_{k})$
-        $k_{\perpendicular}=\sqrt{E_{k}*cos(\theta)+V0}/A_{\hbar}^{2}$
+        $k_{\perpendicular}=\sqrt{max(A_{\hbar}^{2}E_{k}-k_{\parallel}^{2}, 0)
+                                  +A_{\hbar}^{2}V_{0}}$
+
+    This equals $A_{\hbar}\sqrt{E_{k}cos^{2}(\theta)+V_{0}}$ with the emission
+    angle given by $sin(\theta)=|k_{\parallel}|/(A_{\hbar}\sqrt{E_{k}})$,
+    clipped at 1 beyond the photoemission horizon.
 
     where: $\hbar$ is the reduced Planck constant, $m_{e}$ is the electron
     mass, $\theta$ is the electron emission angle, $\k_{\parallel}$ and
     $\k_{perpendicular}$ are the surface parallel and perpendicular momentum,
-    $E_{ph}$ is the photon energy, $E_{b}$ is the electron binding energy and
-    $\Phi$ is the work function.
+    $E_{ph}$ is the photon energy, $E_{b}$ is the electron binding energy,
+    $\Phi$ is the work function and $V_{0}$ is the inner potential.
     Parameters
     ----------
     photon_energy : integers, floats or 1D numpy.ndarray,
@@ -402,26 +685,18 @@ def perpendicular_momentum(photon_energy, parallel_momentum,
             raise ValueError(f'The length of inputs must be the same if '
                              f'their length is larger than 1!')
 
-    # h_bar = sci_const.hbar  # in J.s
-    # m_e = sci_const.m_e  # in Kg or J.s^2/m^2 (E=mc^2)
-    A_hbar = np.sqrt(2 * sci_const.m_e) / sci_const.hbar  # in J^(-1/2).m^(-1)
-
-    Eph = photon_energy * 1.6E-19  # convert from eV to J
-    k_para = parallel_momentum*1E10  # convert from Ang to m
-    Eb = binding_energy * 1.6E-19  # convert from eV to J
-    V0 = inner_potential * 1.6E-19  # convert from eV to J
-    WF = work_function * 1.6E-19  # convert from eV to J
-
-    E_k = (Eph - Eb - WF)  # in J
-    theta = np.arcsin(np.where(1 > np.abs(np.abs(k_para) / (A_hbar*np.sqrt(E_k))),
-                               (np.abs(k_para) / (A_hbar*np.sqrt(E_k))), 1))
-    kz = A_hbar * np.sqrt(E_k * np.cos(theta)**2 + V0)  # in m^(-1)
-    kz *= 1E-10  # convert from m^(-1) to Ang^(-1)
+    E_k = photon_energy - binding_energy - work_function  # in eV
+    # As $cos^{2}(\theta) = 1 - (k_{\parallel}/(A_{\hbar}\sqrt{E_{k}}))^{2}$,
+    # with the sine clipped at 1 beyond the horizon, the emission angle
+    # folds into $A_{\hbar}^{2}E_{k}cos^{2}(\theta)=max(A_{\hbar}^{2}E_{k}-
+    # k_{\parallel}^{2}, 0)$ and no trigonometric functions are needed.
+    kz = np.sqrt(np.maximum(_A_HBAR2 * E_k - np.square(parallel_momentum), 0)
+                 + _A_HBAR2 * inner_potential)  # in Ang^(-1)
 
     return kz
 
 
-units_map = {'kx': '$\AA^{-1}$', 'ky': '$\AA^{-1}$', 'kz': '$\AA^{-1}$',
+units_map = {'kx': r'$\AA^{-1}$', 'ky': r'$\AA^{-1}$', 'kz': r'$\AA^{-1}$',
              'Eb': 'eV', 'Eph': 'eV'}
 
 
@@ -472,10 +747,11 @@ class Band:
     electron band. It assumes a hexagonal crystal structure with the shorter
     primitive translation vector along the $k_{x}$ axis.
 
-    NOTE: These bands take a while to initialize (~ 1 minute) as we generate
-        a 4D intensity spectra and then fit a 4D function to this. This is
-        done at initialization so that calls to self.spectra() can return
-        large, high resolution N-D spectra quickly during use.
+    NOTE: At initialization we generate a 4D intensity spectra (evaluating
+        the band energy over the 3D momentum grid only) which is then
+        interpolated. This is done at initialization, and takes ~ 10 ms, so
+        that calls to self.spectra() can return large, high resolution N-D
+        spectra quickly during use.
 
     Attributes
     ----------
@@ -511,7 +787,7 @@ class Band:
 
     def __init__(self, symmetry_point_energies,
                  lattice_constants=(2.5, 3.4),
-                 g_width=0.4, l_width=0.3):
+                 g_width=0.4, l_width=0.3, seed=None):
         """Initializes the Band class.
 
         Parameters
@@ -533,24 +809,32 @@ class Band:
         g_width, l_width : float, optional.
             The widths of the gaussian (g_width) and lorentzian(l_width)
             broadening of the spectra (in eV) returned by self.spectra(...).
+        seed : None, int or numpy.random.Generator, optional.
+            Seeds the random number generator used for the noise returned by
+            self.spectra(...), passed to numpy.random.default_rng. A Generator
+            is used as is, allowing several bands to share one.
         """
 
         self.symmetry_point_energies = symmetry_point_energies
         self.lattice_constants = lattice_constants
+        self._rng = np.random.default_rng(seed)
+        self._noise_buf = np.empty(0)
         symmetry_lines = [
-            generate_symmetry_lines(energies,
-                                    lattice_constant=lattice_constants[0])
+            _symmetry_lines_cached(tuple(energies), lattice_constants[0])
             for energies in symmetry_point_energies]
         self.symmetry_lines = symmetry_lines
+        # the numeric symmetry line values passed to _energy_kernel
+        self._line_values = tuple(
+            np.array([[line[key] for line in in_plane]
+                      for in_plane in symmetry_lines], dtype=float)
+            for key in ('coefficients', 'origin', 'points'))
 
         BZ_x = (2 * math.pi / lattice_constants[0]) * (1 / 2)
         BZ_y = 2 * BZ_x / np.sqrt(3)
         BZ_z = (2 * math.pi / lattice_constants[1]) * (1 / 2)
         ranges = {'kx': [0, BZ_x + 0.3, 25], 'ky': [0, BZ_y + 0.3, 25],
                   'kz': [0, BZ_z + 0.3, 25], 'Eb': [12, -0.5, 25]}
-        self._interpolation = self._generate_interpolation(ranges,
-                                                           g_width=g_width,
-                                                           l_width=l_width)
+        self._generate_interpolation(ranges, g_width=g_width, l_width=l_width)
 
     def energy(self, kx, ky, kz):
         """
@@ -558,7 +842,7 @@ class Band:
         values.
 
         Used to provide the energy of the band at the given momentum
-        co-ordinates.
+        co-ordinates, this is a single point call to self._energy_vec(...).
 
         Parameters
         ----------
@@ -571,37 +855,34 @@ class Band:
             The binding energy for the given kx, ky, kz value.
         """
 
-        reciprocal_constant = 2 * math.pi / self.lattice_constants[1]
+        Eb = float(self._energy_vec(kx, ky, kz))
 
-        kz_symm_points = [0, reciprocal_constant / 2]
+        return Eb
 
-        # shift the z 'origin' to the BZ boundary and into +ve half
-        kz = (abs(kz) + reciprocal_constant / 2)
-        # translate to the first BZ
-        kz = kz % reciprocal_constant
-        # shift the z 'origin' back to the BZ centre
-        kz = abs(kz - reciprocal_constant / 2)
-        # reduce the in-plane constants to the first BZ.
-        reduced = reduce_to_firstBZ([kx, ky],
-                                    lattice_constants=self.lattice_constants[0])
-
-        points = []
-        # for the 2 kz high symmetry points generate an energy
-        for kz_symm, in_plane in zip(kz_symm_points, self.symmetry_lines):
-            # Generate polynomials parallel to the kx axis for the given ky
-            point_i = (in_plane[0]['x'](reduced[1]),
-                       in_plane[0]['Eb'](reduced[1]).astype(float))
-            point_f = (in_plane[1]['x'](reduced[1]),
-                       in_plane[1]['Eb'](reduced[1]).astype(float))
-            if point_i[0] >= point_f[0]:  # solves an edge case
-                points.append([kz_symm, float(in_plane[0]['Eb'](reduced[1]))])
-            else:
-                in_plane_polynomial = generate1Dpoly([point_i, point_f])
-                in_plane_Eb = float(in_plane_polynomial(reduced[0]))
-                points.append([kz_symm, in_plane_Eb])
+    def _energy_vec(self, kx, ky, kz):
+        """
+        Returns the binding energies in eV for arrays of $k_{x}$, $k_{y}$,
+        $k_{z}$ values.
 
-        polynomial = generate1Dpoly(points)
-        Eb = float(polynomial(kz))
+        A vectorized equivalent of self.energy(...) used to fill the
+        intensity grid in self._generate_interpolation(...). The numeric
+        values of self.symmetry_lines, collected into arrays at
+        initialization, are passed to `_energy_kernel`.
+
+        Parameters
+        ----------
+        kx, ky, kz : float or numpy.ndarray.
+            Broadcastable values (or arrays) of the kx, ky, and kz values for
+            which the energy is required.
+
+        Returns
+        -------
+        Eb : float or numpy.ndarray, in the unit of eV.
+            The binding energies for the given kx, ky, kz values.
+        """
+
+        Eb = _energy_kernel(kx, ky, kz, *self._line_values,
+                            lattice_constants=self.lattice_constants)
 
         return Eb
 
@@ -668,16 +949,20 @@ class Band:
                               else np.linspace(*value))
                        for axis, value in ranges.items()}
 
-        # This next bit is required to deal with arbitrary spectra dimensions
-        values = {axis: array.flatten()  # value lists for each spectra point
-                  for axis, array in zip(axes_coords.keys(),
-                                         np.meshgrid(*axes_coords.values()))}
-        k_para = np.sqrt(np.square(values['kx']) + np.square(values['ky']))
+        # This next bit is required to deal with arbitrary spectra dimensions,
+        # the sparse grids broadcast against each other so only the arrays
+        # that depend on several axes are materialized at full size.
+        values = dict(zip(axes_coords.keys(),  # broadcastable axis values
+                          np.meshgrid(*axes_coords.values(), indexing='ij',
+                                      sparse=True)))
+        k_para = np.hypot(values['kx'], values['ky'])
         if 'Eph' in values.keys():
             E_kin = values['Eph'] - values['Eb'] - work_function
-            values['kz'] = perpendicular_momentum(photon_energy=values['Eph'],
-                                                  parallel_momentum=k_para,
-                                                  binding_energy=values['Eb'])
+            Eph, k_para_Eph, Eb = np.broadcast_arrays(values['Eph'], k_para,
+                                                      values['Eb'])
+            values['kz'] = perpendicular_momentum(
+                photon_energy=Eph.ravel(), parallel_momentum=k_para_Eph.ravel(),
+                binding_energy=Eb.ravel()).reshape(Eph.shape)
             _ = values.pop('Eph')  # remove the converted Eph values
         else:
             E_kin = default_Eph - values['Eb'] - work_function
@@ -685,24 +970,33 @@ class Band:
         k_para_max = np.sin(np.radians(max_angle)) * 0.5123 * np.sqrt(E_kin)
         k_para_max = np.where(3.6 > k_para_max, k_para_max, 3.6)
 
-        coords = [[x, y, z, E] for x, y, z, E in zip(values['kx'], values['ky'],
-                                                     values['kz'], values['Eb'])
-                  ]
-        coords = [reduce_to_firstBZ(coord,
-                                    lattice_constants=self.lattice_constants)
-                  for coord in coords]
-
-        # Intensity interpolation and drop off with increased angle
-        intensity = self._interpolation(coords) * gaussian(k_para, 0,
-                                                           k_para_max / 2)
-        # add noise with Fermi drop-off.
-        intensity += (noise * np.random.rand(*intensity.shape) *
-                      fermi(values['Eb'], zero_offset=0.2,
-                            temperature=temperature))
+        coords = reduce_to_firstBZ([values['kx'], values['ky'],
+                                    values['kz'], values['Eb']],
+                                   lattice_constants=self.lattice_constants)
+        # only materialize the full (N, 4) co-ordinates for the interpolation
+        coords = np.broadcast_arrays(*coords)
+        grid_shape = coords[0].shape
+        coords = np.stack(coords, axis=-1).reshape(-1, 4)
+
+        # Intensity interpolation and drop off with increased angle, the
+        # envelope (and the Fermi function below) are only evaluated over the
+        # sparse axes they depend on and broadcast onto the intensity.
+        intensity = self._interpolation(coords).reshape(grid_shape)
+        intensity *= gaussian(k_para, 0, k_para_max / 2)
+        # draw the random noise into the reused buffer, each point uses it
+        # either inside or outside the horizon so one draw serves both.
+        random = self._random(intensity.shape)
+        random *= noise
+        horizon = k_para > k_para_max
+        inside = ~horizon
+        # add noise with Fermi drop-off (in place to avoid full size copies).
+        np.multiply(random, fermi(values['Eb'], zero_offset=0.2,
+                                  temperature=temperature),
+                    out=random, where=inside)
+        np.add(intensity, random, out=intensity, where=inside)
         # add k parallel horizon.
-        intensity = np.where(k_para <= k_para_max, intensity,
-                             noise * 0.2 * np.random.rand(*intensity.shape))
-        # reshape from 1D to spectra shape
+        np.multiply(random, 0.2, out=intensity, where=horizon)
+        # reshape from the N-D grid to spectra shape
         intensity = intensity.reshape(*shape)
 
         if as_xarray:
@@ -710,12 +1004,39 @@ class Band:
         else:
             return intensity, axes_coords
 
+    def _random(self, shape):
+        """Returns uniform random values in [0, 1) drawn into a reused buffer.
+
+        The buffer is grown to the largest number of points requested so far
+        and reused by later calls, so the returned array is only valid until
+        the next call.
+
+        Parameters
+        ----------
+        shape : tuple of int.
+            The shape of the required array of random values.
+
+        Returns
+        -------
+        random : numpy.ndarray.
+            A view of the buffer with the given shape filled with random
+            values.
+        """
+        size = math.prod(shape)
+        if self._noise_buf.size < size:
+            self._noise_buf = np.empty(size)
+        random = self._noise_buf[:size].reshape(shape)
+        self._rng.random(out=random)
+
+        return random
+
     def _generate_interpolation(self, ranges, g_width=0.4, l_width=0.3):
-        """Returns the interpolation function used for spectra calculations.
+        """Generates the intensity grid used for spectra calculations.
 
-        Run at instantiation time only, this returns the interpolation
-        function that is used to quickly generate spectra, via self.spectra(),
-        during use.
+        Run at instantiation time only, this generates the regular intensity
+        grid (self._grid) and its axis origins (self._grid_origin) and steps
+        (self._grid_step) that are interpolated by self._interpolation(...)
+        to quickly generate spectra, via self.spectra(), during use.
 
         Parameter
         ---------
@@ -731,12 +1052,6 @@ class Band:
         g_width, l_width : float, optional.
             The widths (in eV) of the gaussian (g_width) and lorentzian(l_width)
             broadening of the spectra returned by self.spectra(...).
-
-        Returns
-        -------
-        interp : scipy.interpolate.RegularGridInterpolator
-            Can be called to provide the intensity at a set of ($k_{x}$,
-            $k_{y}$, $k_{z}$ and $E_{b}$) co-ordinates
         """
 
         axes = [axis for axis, value in ranges.items()
@@ -746,25 +1061,49 @@ class Band:
                               if isinstance(value, (int, float))
                               else np.linspace(*value))
                        for axis, value in ranges.items()}
-        # This next bit is required to deal with arbitrary spectra dimensions
-        values = {axis: array.flatten()  # value lists for each spectra point
-                  for axis, array in zip(axes_coords.keys(),
-                                         np.meshgrid(*axes_coords.values()))}
-
-        Eband = np.array([self.energy(kx, ky, kz)
-                          for kx, ky, kz in zip(values['kx'], values['ky'],
-                                                values['kz'])])
+        # This next bit is required to deal with arbitrary spectra dimensions,
+        # with sparse grids the band energy is only evaluated over the
+        # momentum axes and the Fermi function only along the energy axis.
+        values = dict(zip(axes_coords.keys(),  # broadcastable axis values
+                          np.meshgrid(*axes_coords.values(), indexing='ij',
+                                      sparse=True)))
+
+        Eband = self._energy_vec(values['kx'], values['ky'], values['kz'])
         intensity = self._intensity(values['kx'], values['Eb'], Eband,
                                     g_width=g_width, l_width=l_width)
 
-        spectra = intensity.reshape(*shape)
+        # stored in single precision to halve the grid memory and bandwidth
+        spectra = intensity.reshape(*shape).astype(np.float32)
 
-        interp = RegularGridInterpolator((axes_coords['kx'],
-                                          axes_coords['ky'], axes_coords['kz'],
-                                          axes_coords['Eb']),
-                                         spectra)
+        self._grid = spectra
+        self._grid_origin = np.array([axes_coords[axis][0]
+                                      for axis in ('kx', 'ky', 'kz', 'Eb')])
+        self._grid_step = np.array([axes_coords[axis][1] - axes_coords[axis][0]
+                                    for axis in ('kx', 'ky', 'kz', 'Eb')])
 
-        return interp
+    def _interpolation(self, coords):
+        """Returns the intensity at a set of co-ordinates.
+
+        Linearly interpolates the intensity grid generated by
+        self._generate_interpolation(...) using
+        `scipy.ndimage.map_coordinates`, co-ordinates outside the grid take
+        the value of the nearest grid edge.
+
+        Parameters
+        ----------
+        coords : numpy.ndarray.
+            A (N, 4) array of the ($k_{x}$, $k_{y}$, $k_{z}$ and $E_{b}$)
+            co-ordinates for which the intensity is required.
+
+        Returns
+        -------
+        intensity : numpy.ndarray.
+            The (N,) intensities at the given co-ordinates.
+        """
+        indices = (coords - self._grid_origin) / self._grid_step
+
+        return map_coordinates(self._grid, indices.T, output=np.float64,
+                               order=1, mode='nearest')
 
     def _intensity(self, kx, Eb, Eband, g_width=0.4, l_width=0.3):
         """Return the Intensity at the kx, ky, kz, Eb point
@@ -776,9 +1115,9 @@ class Band:
         Parameters
         ----------
         kx, Eb, Eband: float or numpy.ndarray.
-            Value(s) of the momentum (in inverse Angstroms), binding energy
-            (in eV) and band energy (in eV) for which to calculate the
-            spectral intensity.
+            Broadcastable value(s) of the momentum (in inverse Angstroms),
+            binding energy (in eV) and band energy (in eV) for which to
+            calculate the spectral intensity.
         g_width, l_width : float, optional.
             The widths (in eV) of the gaussian (g_width) and lorentzian(l_width)
             broadening of the spectra.
@@ -789,13 +1128,23 @@ class Band:
             Returns the intensity for a range of ($k_{x}$, $k_{y}$, $k_{z}$
             and $E_{b}$) co-ordinates.
         """
+        # single precision is ample for the (noisy) interpolated spectra
+        kx, Eb, Eband = (np.asarray(value, dtype=np.float32)
+                         for value in (kx, Eb, Eband))
         # width increase with increasing band energy
-        added_widths = np.array([0.05 * abs(eband) for eband in Eband])
-        intensity = np.zeros(*kx.shape)
-        # The Gaussian, Lorentzian and Fermi broadening Intensity
-        intensity += (gaussian(Eb, Eband, added_widths + g_width) *
-                      lorentzian(Eb, Eband, added_widths + l_width) *
-                      fermi(Eb))
+        added_widths = 0.05 * np.abs(Eband)
+        g_widths = added_widths + g_width
+        l_widths = added_widths + l_width
+        intensity = np.zeros(np.broadcast_shapes(kx.shape, Eb.shape,
+                                                 Eband.shape), dtype=kx.dtype)
+        # The Gaussian, Lorentzian and Fermi broadening Intensity, this is
+        # gaussian(...) * lorentzian(...) * fermi(...) evaluated in place with
+        # the shared (Eb - Eband)**2 term and normalization constants folded.
+        delta_sq = np.square(Eb - Eband)
+        broadening = np.exp(-delta_sq / (2 * g_widths ** 2))
+        broadening *= l_widths / ((delta_sq + l_widths ** 2) * g_widths)
+        broadening *= fermi(Eb)
+        intensity += broadening / (2 * np.pi * np.sqrt(2 * np.pi))
 
         return intensity
 
@@ -826,6 +1175,9 @@ class Bands:
             The widths (in eV) of the gaussian (g_width) and lorentzian(l_width)
             broadening of the spectra. If a list is given then it must
             have the same length as there are elements in symmetry_energies.
+    seed : None, int or numpy.random.Generator, optional.
+            Seeds the random number generator, shared by all of the bands,
+            used for the noise in the spectra.
 
     Attributes
     ----------
@@ -835,7 +1187,7 @@ class Bands:
     """
 
     def __init__(self, symmetry_energies, lattice_constants,
-                 g_width=0.4, l_width=0.3):
+                 g_width=0.4, l_width=0.3, seed=None):
 
         if isinstance(g_width, (int, float)):  # create a list
             g_width = [g_width] * len(symmetry_energies)
@@ -857,6 +1209,7 @@ class Bands:
                                  f'{len(l_width)=}, and '
                                  f'{len(symmetry_energies)=}')
 
+        rng = np.random.default_rng(seed)
         num_bands = len(symmetry_energies)
         for i, (band, point_energies) in enumerate(symmetry_energies.items()):
             start_time = time.time()
@@ -864,7 +1217,8 @@ class Bands:
             setattr(self, band,
                     Band(symmetry_point_energies=point_energies,
                          lattice_constants=lattice_constants,
-                         g_width=g_width[i], l_width=l_width[i]))
+                         g_width=g_width[i], l_width=l_width[i],
+                         seed=rng))
             band_time = (time.time() - start_time)
             print(f'Time for {band} was {round(band_time)} s')
             print(f'Remaining time estimate: {round(band_time * 
@@ -890,11 +1244,11 @@ class Arpes:
     method to return but will provide a smoother spectra and extends it from
     2D to up to 4D.
 
-    NOTE: These class objects take a while to initialize (~ 1 minute per band)
-        as we generate a 4D intensity spectra and then fit a 4D function to
-        this. This is done at initialization so that calls to self.spectra()
-        and/or self.detector_image) can return large, high resolution N-D
-        spectra quickly during use.
+    NOTE: At initialization we generate a 4D intensity spectra for each band
+        which is then interpolated (~ 10 ms per band). This is done at
+        initialization so that calls to self.spectra() and/or
+        self.detector_image) can return large, high resolution N-D spectra
+        quickly during use.
 
     Attributes
     ----------
@@ -913,7 +1267,8 @@ class Arpes:
     """
 
     def __init__(self, symmetry_energies=default_symmetry_energies,
-                 lattice_constants=(2.5, 3.4), g_width=0.3, l_width=0.3):
+                 lattice_constants=(2.5, 3.4), g_width=0.3, l_width=0.3,
+                 seed=None):
         """The initialization method for the ArpesData class.
 
         Parameters
@@ -940,10 +1295,15 @@ class Arpes:
             The widths of the gaussian (g_width) and lorentzian(l_width)
             broadening of the spectra (in eV). If a list is given then it must
             have the same length as there are elements in symmetry_energies.
+        seed : None, int or numpy.random.Generator, optional.
+            Seeds the random number generator used for all of the noise in
+            the returned spectra and detector images, giving reproducible
+            output when set.
         """
+        self._rng = np.random.default_rng(seed)
         self.bands = Bands(symmetry_energies=symmetry_energies,
                            lattice_constants=lattice_constants,
-                           g_width=g_width, l_width=l_width)
+                           g_width=g_width, l_width=l_width, seed=self._rng)
 
     def spectra(self, ranges, noise=0.04, temperature=300, default_Eph=45,
                 as_xarray=True):
@@ -1090,8 +1450,8 @@ class Arpes:
             else:
                 ranges['Eb'] = [12, -0.5, initial_resolution[1]]
             # generate the left/right detector region not without spectra.
-            added_range = noise * 0.2 * np.random.rand(initial_resolution[0],
-                                                       added_points[0]) / 2
+            added_range = noise * 0.2 * self._rng.random(
+                (initial_resolution[0], added_points[0])) / 2
 
         else:  # if a constant Eb image is requested
             # create non-used detector regions with k range>k horizon(2).
@@ -1100,8 +1460,8 @@ class Arpes:
                       'Eb': Eb, 'Eph': Eph}
             # generate the left/right detector region not without spectra.
             if added_points[0]:
-                added_range = noise * 0.2 * np.random.rand(initial_resolution[0]
-                                                           ,added_points[1]) / 2
+                added_range = noise * 0.2 * self._rng.random(
+                    (initial_resolution[0], added_points[1])) / 2
 
         # generate the spectra.
         image, axes_coords = self.spectra(ranges, temperature=T,
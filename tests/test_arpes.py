@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import scipy.constants as sci_const
+
+from test_data import arpes
+
+SYMMETRY_POINT_ENERGIES = [[-2, 3, 2], [-3, 7, 6]]
+
+
+def test_band_spectra_seed():
+    ranges = {"kx": [-1, 1, 20], "ky": 0.1, "kz": 0.3, "Eb": [5, -0.5, 30]}
+    bands = [arpes.Band(SYMMETRY_POINT_ENERGIES, seed=seed) for seed in (1, 1, 2)]
+    spectra = [band.spectra(ranges, as_xarray=False)[0] for band in bands]
+
+    np.testing.assert_array_equal(spectra[0], spectra[1])
+    assert not np.array_equal(spectra[0], spectra[2])
+
+
+@pytest.mark.parametrize("num_points", [2, 3, 70])
+def test_hermite_zero_deriv_matches_generate1Dpoly(num_points):
+    rng = np.random.default_rng(0)
+    xs = np.sort(rng.uniform(-5, 5, num_points))
+    ys = rng.uniform(-3, 3, (num_points, 4))
+    x = np.linspace(-6, 6, 301)[:, np.newaxis]  # includes extrapolation
+
+    coefs = arpes._build_hermite_zero_deriv(xs, ys)
+    expected = np.stack(
+        [arpes.generate1Dpoly(list(zip(xs, column)))(x[:, 0]) for column in ys.T],
+        axis=-1,
+    )
+
+    np.testing.assert_allclose(arpes._eval_hermite(coefs, xs, x), expected)
+
+
+def test_hermite_zero_deriv_requires_increasing_knots():
+    with pytest.raises(ValueError, match="strictly increasing"):
+        arpes._build_hermite_zero_deriv([0, 1, 1], [0, 1, 2])
+
+
+@pytest.mark.parametrize(("i", "j", "k"), [(10, 20, 5), (22, 6, 20), (5, 12, 24)])
+def test_band_grid_orientation(i, j, k):
+    band = arpes.Band(SYMMETRY_POINT_ENERGIES)
+    origin, step = band._grid_origin, band._grid_step
+    Eb = origin[3] + step[3] * np.arange(band._grid.shape[3])
+
+    def nearest_Eb(kx_index, ky_index):
+        energy = band.energy(
+            origin[0] + kx_index * step[0],
+            origin[1] + ky_index * step[1],
+            origin[2] + k * step[2],
+        )
+        return np.argmin(np.abs(Eb - energy))
+
+    # the band peaks at the energy for (kx[i], ky[j]), not the swapped (kx[j], ky[i])
+    assert nearest_Eb(i, j) != nearest_Eb(j, i)
+    assert np.argmax(band._grid[i, j, k]) == nearest_Eb(i, j)
+
+
+BZ_SIZE = np.pi / 2.5  # half the in-plane reciprocal lattice vector for a = 2.5
+GAMMA, M, K = (0, 0), (BZ_SIZE, 0), (BZ_SIZE, BZ_SIZE / np.sqrt(3))
+
+
+@pytest.mark.parametrize(
+    ("point", "expected"),
+    [
+        (GAMMA, GAMMA),
+        (M, M),
+        (K, K),
+        ((-BZ_SIZE, 0), M),
+        ((BZ_SIZE / 2, BZ_SIZE * np.sqrt(3) / 2), M),  # M rotated by 60 deg
+        ((-BZ_SIZE, -BZ_SIZE / np.sqrt(3)), K),
+        ((0.3 + 2 * BZ_SIZE, 0.1), (0.3, 0.1)),  # translated by (2 * BZ_SIZE, 0)
+    ],
+)
+def test_reduce_to_firstBZ_reference_points(point, expected):
+    np.testing.assert_allclose(
+        arpes.reduce_to_firstBZ(list(point), 2.5), expected, atol=1e-12
+    )
+
+
+def test_reduce_to_firstBZ_vectorized_matches_scalar():
+    rng = np.random.default_rng(0)
+    kx, ky, kz = rng.uniform(-6, 6, (3, 200))
+    Eb = rng.uniform(-1, 10, 200)
+
+    reduced = arpes.reduce_to_firstBZ([kx, ky, kz, Eb])
+    scalar = np.array(
+        [arpes.reduce_to_firstBZ(point) for point in zip(kx, ky, kz, Eb)]
+    ).T
+
+    np.testing.assert_allclose(np.array(reduced), scalar, atol=1e-12)
+    # everything ends up in the minimal unique hexagonal region
+    assert np.all(reduced[0] <= BZ_SIZE + 1e-12)
+    assert np.all(reduced[0] >= np.sqrt(3) * reduced[1] - 1e-12)
+    np.testing.assert_array_equal(reduced[3], Eb)
+
+
+def test_reduce_to_firstBZ_fast_path():
+    rng = np.random.default_rng(2)
+    kx = rng.uniform(0, BZ_SIZE, 300)
+    inside = [kx, rng.uniform(0, 1, 300) * kx / np.sqrt(3)]
+    outside = list(rng.uniform(-6, 6, (2, 20)))
+
+    # mostly inside points gather the outside ones, mostly outside reduce all
+    gathered = arpes.reduce_to_firstBZ(
+        [np.concatenate(axis) for axis in zip(inside, outside)], 2.5
+    )
+    full = arpes.reduce_to_firstBZ(outside, 2.5)
+
+    np.testing.assert_array_equal(np.array(gathered)[:, :300], inside)
+    np.testing.assert_allclose(np.array(gathered)[:, 300:], full, atol=1e-12)
+    np.testing.assert_array_equal(arpes.reduce_to_firstBZ(inside, 2.5), inside)
+
+
+def test_reduce_to_firstBZ_lattice_translation():
+    rng = np.random.default_rng(1)
+    kx, ky = rng.uniform(-2, 2, (2, 200))
+    translation = (BZ_SIZE, BZ_SIZE * np.sqrt(3))
+
+    reduced = arpes.reduce_to_firstBZ([kx, ky], 2.5)
+    translated = arpes.reduce_to_firstBZ(
+        [kx + 3 * translation[0], ky - 3 * translation[1]], 2.5
+    )
+
+    np.testing.assert_allclose(translated, reduced, atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "ky",
+    [
+        2 * BZ_SIZE / np.sqrt(3),  # the top hexagon vertex, equivalent to K
+        np.nextafter(2 * BZ_SIZE / np.sqrt(3), 0),
+        1.451039491387374,
+    ],
+)
+def test_reduce_to_firstBZ_translation_boundary(ky):
+    # ky + BZ_SIZE / sqrt(3) lands on a multiple of the oblique translation
+    np.testing.assert_allclose(arpes.reduce_to_firstBZ([0, ky], 2.5), K, atol=1e-12)
+
+
+def _perpendicular_momentum_arcsin(Eph, k_para, Eb, V0, WF):
+    """The emission angle form of perpendicular_momentum, in SI units."""
+    A_hbar = np.sqrt(2 * sci_const.m_e) / sci_const.hbar
+    E_k = (Eph - Eb - WF) * 1.6e-19
+    with np.errstate(invalid="ignore"):  # sqrt(E_k) when E_k < 0
+        ratio = np.abs(k_para * 1e10) / (A_hbar * np.sqrt(E_k))
+    theta = np.arcsin(np.where(ratio < 1, ratio, 1))  # clip at horizon
+    return A_hbar * np.sqrt(E_k * np.cos(theta) ** 2 + V0 * 1.6e-19) * 1e-10
+
+
+@pytest.mark.parametrize(
+    ("Eph", "Eb"),
+    [
+        (45.0, 0.0),
+        (20.0, 3.0),
+        (6.0, 0.5),  # most of the k_para range is past the horizon
+        (3.0, 0.0),  # E_k < 0
+    ],
+)
+def test_perpendicular_momentum_matches_emission_angle_form(Eph, Eb):
+    k_para = np.linspace(-3, 3, 61)
+
+    kz = arpes.perpendicular_momentum(
+        Eph, k_para, binding_energy=Eb, inner_potential=15.0, work_function=5.0
+    )
+    expected = _perpendicular_momentum_arcsin(Eph, k_para, Eb, 15.0, 5.0)
+
+    np.testing.assert_allclose(kz, expected, rtol=1e-12)